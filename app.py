@@ -1,297 +1,76 @@
+import math
 import tkinter as tk
+import tkinter.font as tkfont
 from tkinter import ttk, messagebox
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Dict, Optional
-import json
-import os
-
-EXPENSE_CATEGORIES = [
-    "Транспорт",
-    "Аренда",
-    "Коммунальные услуги",
-    "Связь и интернет",
-    "Прочие операционные расходы",
-]
-
-INCOME_CATEGORIES = [
-    "Оказание услуг",
-    "Продажа товаров",
-    "Проценты и прочие доходы",
-    "Прочие доходы",
-]
-
-BASE_CURRENCY = "RUB"
-
-
-@dataclass
-class Account:
-    id: int
-    name: str
-    acc_type: str
-    currency: str = BASE_CURRENCY
-    initial_balance: float = 0.0
-
-    def to_dict(self) -> Dict:
-        return {
-            "id": self.id,
-            "name": self.name,
-            "acc_type": self.acc_type,
-            "currency": self.currency,
-            "initial_balance": self.initial_balance,
-        }
-
-    @classmethod
-    def from_dict(cls, data: Dict) -> "Account":
-        return cls(
-            id=data["id"],
-            name=data["name"],
-            acc_type=data.get("acc_type", "Счет"),
-            currency=data.get("currency", BASE_CURRENCY),
-            initial_balance=float(data.get("initial_balance", 0.0)),
-        )
-
-@dataclass
-class Transaction:
-    id: int
-    date: datetime
-    account_id: int
-    category: str
-    description: str
-    amount: float
-    currency: str = BASE_CURRENCY
-
-    def to_dict(self) -> Dict:
-        return {
-            "id": self.id,
-            "date": self.date.isoformat(),
-            "account_id": self.account_id,
-            "category": self.category,
-            "description": self.description,
-            "amount": self.amount,
-            "currency": self.currency,
-        }
-
-    @classmethod
-    def from_dict(cls, data: Dict) -> "Transaction":
-        return cls(
-            id=data["id"],
-            date=datetime.fromisoformat(data["date"]),
-            account_id=int(data.get("account_id", 1)),
-            category=data.get("category", "Прочие операционные расходы"),
-            description=data.get("description", ""),
-            amount=float(data.get("amount", 0.0)),
-            currency=data.get("currency", BASE_CURRENCY),
-        )
-
-
-
-class DataStore:
-    def __init__(self, path: str = "fintech_data_full.json"):
-        self.path = path
-        self.accounts: List[Account] = []
-        self.transactions: List[Transaction] = []
-        self.settings: Dict[str, str] = {
-            "user_name": "Компания",
-        }
-        self._next_acc_id = 1
-        self._next_tx_id = 1
-
-        self.load()
-        if not self.accounts:
-            self.add_account("Расчетный счет", "Карта", BASE_CURRENCY, 0.0)
-            self.save()
-
-
-    def get_user_name(self) -> str:
-        return self.settings.get("user_name", "Компания")
-
-
-    def add_account(
-        self,
-        name: str,
-        acc_type: str,
-        currency: str,
-        initial_balance: float,
-    ) -> Account:
-        acc = Account(
-            id=self._next_acc_id,
-            name=name,
-            acc_type=acc_type,
-            currency=currency,
-            initial_balance=initial_balance,
-        )
-        self.accounts.append(acc)
-        self._next_acc_id += 1
-        self.save()
-        return acc
-
-    def update_account(
-        self,
-        acc_id: int,
-        name: str,
-        acc_type: str,
-        initial_balance: float,
-    ) -> None:
-        acc = self.get_account_by_id(acc_id)
-        if not acc:
-            return
-        acc.name = name
-        acc.acc_type = acc_type
-        acc.initial_balance = initial_balance
-        self.save()
-
-    def get_accounts(self) -> List[Account]:
-        return list(self.accounts)
-
-    def get_account_by_id(self, acc_id: int) -> Optional[Account]:
-        for acc in self.accounts:
-            if acc.id == acc_id:
-                return acc
-        return None
-
-    def get_account_balance(self, acc_id: int) -> float:
-        acc = self.get_account_by_id(acc_id)
-        if not acc:
-            return 0.0
-        total = acc.initial_balance
-        for t in self.transactions:
-            if t.account_id == acc_id and t.currency == acc.currency:
-                total += t.amount
-        return total
-
-    def get_overall_balance(self) -> float:
-        total = 0.0
-        for acc in self.accounts:
-            total += self.get_account_balance(acc.id)
-        return total
-
-
-    def add_transaction(
-        self,
-        account_id: int,
-        amount: float,
-        category: str,
-        description: str,
-        date: Optional[datetime] = None,
-    ) -> Transaction:
-        if date is None:
-            date = datetime.now()
-        tx = Transaction(
-            id=self._next_tx_id,
-            date=date,
-            account_id=account_id,
-            category=category,
-            description=description,
-            amount=amount,
-            currency=BASE_CURRENCY,
-        )
-        self.transactions.append(tx)
-        self._next_tx_id += 1
-        self.save()
-        return tx
-
-    def update_transaction(
-        self,
-        tx_id: int,
-        account_id: int,
-        amount: float,
-        category: str,
-        description: str,
-    ) -> None:
-        tx = self.get_transaction_by_id(tx_id)
-        if not tx:
-            return
-        tx.account_id = account_id
-        tx.amount = amount
-        tx.category = category
-        tx.description = description
-        self.save()
-
-    def delete_transaction(self, tx_id: int) -> None:
-        self.transactions = [t for t in self.transactions if t.id != tx_id]
-        self.save()
-
-    def get_transactions(self) -> List[Transaction]:
-        return sorted(self.transactions, key=lambda t: t.date, reverse=True)
-
-    def get_transaction_by_id(self, tx_id: int) -> Optional[Transaction]:
-        for t in self.transactions:
-            if t.id == tx_id:
-                return t
-        return None
-
-    def get_month_summary(self):
-        """Возвращает доход (>0), расход (<0) и суммы по категориям за текущий месяц."""
-        now = datetime.now()
-        income = 0.0
-        expense = 0.0
-        by_category: Dict[str, float] = {}
-
-        for t in self.transactions:
-            if t.date.year == now.year and t.date.month == now.month:
-                if t.amount >= 0:
-                    income += t.amount
-                else:
-                    expense += t.amount
-                by_category[t.category] = by_category.get(t.category, 0.0) + t.amount
-
-        return income, expense, by_category
-
-    # ---- экспорт ----
-
-    def export_csv(self, filename: str = "Отчет.csv") -> None:
-        """
-        Экспорт в CSV с разделителем ; и заголовками на русском.
-        Кодировка utf-8-sig, чтобы Excel корректно отображал текст.
-        """
-        lines = ["ID;Дата;Счет;Категория;Описание;Сумма;Валюта"]
-        acc_by_id = {a.id: a for a in self.accounts}
-        for t in self.get_transactions():
-            acc_name = acc_by_id.get(t.account_id).name if acc_by_id.get(t.account_id) else "?"
-            desc = t.description.replace(";", ",")
-            line = (
-                f"{t.id};{t.date.strftime('%Y-%m-%d %H:%M')};"
-                f"{acc_name};{t.category};\"{desc}\";{t.amount};{BASE_CURRENCY}"
-            )
-            lines.append(line)
-
-        with open(filename, "w", encoding="utf-8-sig") as f:
-            f.write("\n".join(lines))
-
-    # ---- load / save ----
-
-    def load(self) -> None:
-        if not os.path.exists(self.path):
-            return
-        try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                raw = json.load(f)
-            self.accounts = [
-                Account.from_dict(item) for item in raw.get("accounts", [])
-            ]
-            self.transactions = [
-                Transaction.from_dict(item) for item in raw.get("transactions", [])
-            ]
-            if self.accounts:
-                self._next_acc_id = max(a.id for a in self.accounts) + 1
-            if self.transactions:
-                self._next_tx_id = max(t.id for t in self.transactions) + 1
-            self.settings.update(raw.get("settings", {}))
-        except Exception as e:
-            print("Ошибка загрузки данных:", e)
+from typing import List, Dict, Optional, Set, Tuple
+
+from datastore import (
+    BASE_CURRENCY,
+    EXPENSE_CATEGORIES,
+    INCOME_CATEGORIES,
+    Account,
+    DataStore,
+)
+
+# Именованные шрифты Tk: создаются один раз в App._create_fonts, дальше стили
+# и виджеты ссылаются на них по имени, и Tk не разбирает описание шрифта заново
+FONT_TEXT = "FinText"
+FONT_SMALL = "FinSmall"
+FONT_SMALL_BOLD = "FinSmallBold"
+FONT_HEADER = "FinHeader"
+FONT_VALUE = "FinValue"
+FONT_VALUE_LARGE = "FinValueLarge"
+
+_FONT_SPECS = {
+    FONT_TEXT: {"family": "Segoe UI", "size": 10},
+    FONT_SMALL: {"family": "Segoe UI", "size": 9},
+    FONT_SMALL_BOLD: {"family": "Segoe UI", "size": 9, "weight": "bold"},
+    FONT_HEADER: {"family": "Segoe UI Semibold", "size": 18},
+    FONT_VALUE: {"family": "Segoe UI Semibold", "size": 16},
+    FONT_VALUE_LARGE: {"family": "Segoe UI Semibold", "size": 20},
+}
+
+
+def _sync_tree(
+    tree: ttk.Treeview,
+    rows: List[Tuple[str, tuple, tuple]],
+    shown: Dict[str, tuple],
+    hidden: Set[str] = frozenset(),
+) -> None:
+    """
+    Приводит строки таблицы к rows = [(iid, values, tags), ...], меняя только
+    отличающиеся строки. Строки из hidden не удаляются, а отсоединяются
+    (detach), чтобы потом вернуть их без пересоздания. shown хранит
+    iid -> (values, tags, attached) всех строк таблицы и обновляется.
+    """
+    wanted = {iid for iid, _, _ in rows}
+    for iid in [i for i in shown if i not in wanted]:
+        values, tags, attached = shown[iid]
+        if iid in hidden:
+            if attached:
+                tree.detach(iid)
+                shown[iid] = (values, tags, False)
+        else:
+            tree.delete(iid)
+            del shown[iid]
+
+    # новые и возвращаемые строки сразу встают на свое место, так что обычно
+    # порядок уже совпадает и общий проход с move не нужен
+    for index, (iid, values, tags) in enumerate(rows):
+        old = shown.get(iid)
+        if old is None:
+            tree.insert("", index, iid=iid, values=values, tags=tags)
+        else:
+            if not old[2]:
+                tree.move(iid, "", index)
+            if old[0] != values or old[1] != tags:
+                tree.item(iid, values=values, tags=tags)
+        shown[iid] = (values, tags, True)
 
-    def save(self) -> None:
-        try:
-            data = {
-                "accounts": [a.to_dict() for a in self.accounts],
-                "transactions": [t.to_dict() for t in self.transactions],
-                "settings": self.settings,
-            }
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print("Ошибка сохранения данных:", e)
+    order = tuple(iid for iid, _, _ in rows)
+    if tree.get_children() != order:
+        for index, iid in enumerate(order):
+            tree.move(iid, "", index)
 
 
 class Card(ttk.Frame):
@@ -391,6 +170,9 @@ class AddAccountDialog(tk.Toplevel):
         try:
             bal = float(self.balance_entry.get().replace(",", ".").replace(" ", ""))
         except ValueError:
+            bal = math.nan
+        # float() принимает и "inf", "nan", "1e400" - такие суммы не сохраняются
+        if not math.isfinite(bal):
             messagebox.showerror("Ошибка", "Неверный баланс.")
             return
 
@@ -525,6 +307,8 @@ class AddTransactionDialog(tk.Toplevel):
         try:
             amount = float(self.amount_entry.get().replace(",", ".").replace(" ", ""))
         except ValueError:
+            amount = math.nan
+        if not math.isfinite(amount):
             messagebox.showerror("Ошибка", "Неверная сумма.")
             return
 
@@ -557,10 +341,45 @@ class AddTransactionDialog(tk.Toplevel):
         self.on_save()
         self.destroy()
 
-class OverviewPage(ttk.Frame):
+class Page(ttk.Frame):
+    """
+    Вкладка приложения. Подписывается на темы изменений DataStore из topics
+    и перерисовывается лениво: не чаще раза за цикл событий и только когда
+    она на экране; скрытая вкладка обновится при переходе на нее.
+    Подкласс задает refresh - полную перерисовку по текущим данным.
+    """
+
+    topics: Tuple[str, ...] = ("accounts", "transactions")
+
     def __init__(self, parent, store: DataStore):
         super().__init__(parent)
         self.store = store
+        # данные изменились, а страница еще не перерисована
+        self._stale = True
+        self._refresh_job = None
+        for topic in self.topics:
+            store.subscribe(topic, self.invalidate)
+
+    def invalidate(self):
+        self._stale = True
+        if self._refresh_job is None:
+            self._refresh_job = self.after_idle(self._refresh_if_visible)
+
+    def _refresh_if_visible(self):
+        self._refresh_job = None
+        # у скрытой вкладки Notebook ее фрейм не отображен
+        if self.winfo_ismapped():
+            self.refresh_if_stale()
+
+    def refresh_if_stale(self):
+        if self._stale:
+            self._stale = False
+            self.refresh()
+
+
+class OverviewPage(Page):
+    def __init__(self, parent, store: DataStore):
+        super().__init__(parent, store)
         self._build()
 
     def _build(self):
@@ -593,8 +412,6 @@ class OverviewPage(ttk.Frame):
             row=0, column=2, sticky="nsew", padx=(4, 0)
         )
 
-        self.refresh()
-
     def refresh(self):
         income, expense, _ = self.store.get_month_summary()
         balance = self.store.get_overall_balance()
@@ -604,11 +421,13 @@ class OverviewPage(ttk.Frame):
         self.expense_var.set(f"{expense:,.2f} {BASE_CURRENCY}")
 
 
-class AccountsPage(ttk.Frame):
-    def __init__(self, parent, store: DataStore, on_changed):
-        super().__init__(parent)
-        self.store = store
-        self.on_changed = on_changed
+class AccountsPage(Page):
+    # балансы счетов зависят и от операций
+    topics = ("accounts", "transactions")
+
+    def __init__(self, parent, store: DataStore):
+        super().__init__(parent, store)
+        self._shown: Dict[str, tuple] = {}
         self._build()
 
     def _build(self):
@@ -660,26 +479,22 @@ class AccountsPage(ttk.Frame):
 
         self.tree.bind("<Double-1>", self._on_double_click)
 
-        self.refresh()
-
     def refresh(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
+        rows = []
         for acc in self.store.get_accounts():
             bal = self.store.get_account_balance(acc.id)
-            self.tree.insert(
-                "",
-                "end",
-                iid=str(acc.id),
-                values=(
+            rows.append((
+                str(acc.id),
+                (
                     acc.name,
                     acc.acc_type,
                     acc.currency,
-                    f"{acc.initial_balance:,.2f}",
+                    acc.initial_str,
                     f"{bal:,.2f}",
                 ),
-            )
+                (),
+            ))
+        _sync_tree(self.tree, rows, self._shown)
 
     def _on_double_click(self, event):
         item = self.tree.focus()
@@ -689,15 +504,15 @@ class AccountsPage(ttk.Frame):
         AddAccountDialog(self, self.store, self._after_change, account_id=acc_id)
 
     def _after_change(self):
-        self.refresh()
-        self.on_changed()
+        self.store.notify("accounts")
 
 
-class TransactionsPage(ttk.Frame):
-    def __init__(self, parent, store: DataStore, on_changed):
-        super().__init__(parent)
-        self.store = store
-        self.on_changed = on_changed
+class TransactionsPage(Page):
+    def __init__(self, parent, store: DataStore):
+        super().__init__(parent, store)
+        self._shown: Dict[str, tuple] = {}
+        self._acc_map: Dict[int, Account] = {}
+        self._acc_map_version = -1
         self._build()
 
     def _build(self):
@@ -796,8 +611,6 @@ class TransactionsPage(ttk.Frame):
 
         self.tree.bind("<Double-1>", self._on_double_click)
 
-        self.refresh()
-
     def _get_selected_tx_id(self) -> Optional[int]:
         selection = self.tree.selection()
         if not selection:
@@ -808,37 +621,50 @@ class TransactionsPage(ttk.Frame):
             return None
 
     def refresh(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
+        version = self.store.get_accounts_version()
+        if version != self._acc_map_version:
+            self._acc_map = self.store.get_accounts_map()
+            self._acc_map_version = version
+            acc_names = ["Все"] + [a.name for a in self._acc_map.values()]
+            self.filter_acc_combo["values"] = acc_names
+            if self.filter_acc_var.get() not in acc_names:
+                self.filter_acc_var.set("Все")
 
         acc_filter = self.filter_acc_var.get()
-        acc_by_id = {a.id: a for a in self.store.get_accounts()}
+        acc_by_id = self._acc_map
 
-        row_index = 0
+        visible = []
+        hidden = set()
         for t in self.store.get_transactions():
             acc = acc_by_id.get(t.account_id)
             acc_name = acc.name if acc else "?"
             if acc_filter != "Все" and acc_name != acc_filter:
+                hidden.add(str(t.id))
                 continue
-
+            visible.append((t, acc_name))
+
+        rows = []
+        # полосы считаются от последней строки: новая операция встает наверх
+        # и не меняет цвет остальных строк
+        row_index = len(visible)
+        for t, acc_name in visible:
+            row_index -= 1
             base_tags = []
             base_tags.append("income" if t.amount >= 0 else "expense")
             base_tags.append("row_even" if row_index % 2 == 0 else "row_odd")
-            row_index += 1
-
-            self.tree.insert(
-                "",
-                "end",
-                iid=str(t.id),
-                values=(
-                    t.date.strftime("%Y-%m-%d %H:%M"),
+
+            rows.append((
+                str(t.id),
+                (
+                    t.date_str,
                     acc_name,
                     t.category,
                     t.description,
-                    f"{t.amount:,.2f}",
+                    t.amount_str,
                 ),
-                tags=tuple(base_tags),
-            )
+                tuple(base_tags),
+            ))
+        _sync_tree(self.tree, rows, self._shown, hidden)
 
     def _on_double_click(self, event):
         tx_id = self._get_selected_tx_id()
@@ -864,8 +690,7 @@ class TransactionsPage(ttk.Frame):
         self._after_change()
 
     def _after_change(self):
-        self.refresh()
-        self.on_changed()
+        self.store.notify("transactions")
 
     def _export(self):
         try:
@@ -878,10 +703,37 @@ class TransactionsPage(ttk.Frame):
             messagebox.showerror("Ошибка экспорта", str(e))
 
 
-class AnalyticsPage(ttk.Frame):
+_INCOME_COLOR = "#22C55E"
+_EXPENSE_COLOR = "#EF4444"
+# столбцы графика аналитики: подпись и цвет (None - по знаку результата)
+_BAR_SPEC = (
+    ("Доход", _INCOME_COLOR),
+    ("Расход", _EXPENSE_COLOR),
+    ("Результат", None),
+)
+
+
+class AnalyticsPage(Page):
+    # сводка за месяц от счетов не зависит
+    topics = ("transactions",)
+
     def __init__(self, parent, store: DataStore):
-        super().__init__(parent)
-        self.store = store
+        super().__init__(parent, store)
+        # размер холста и значения, с которыми нарисован график
+        self._chart_key = None
+        # (доход, расход), под которые сейчас настроены цвета и подписи столбцов
+        self._chart_values = None
+        # сводка за месяц, полученная при последнем refresh()
+        self._summary = None
+        # отложенная перерисовка после изменения размеров холста
+        self._redraw_job = None
+        # размер холста из последнего события <Configure>
+        self._canvas_size: Optional[Tuple[int, int]] = None
+        # холст хотя бы раз был показан на экране
+        self._canvas_mapped = False
+        # текст, который сейчас показан в поле выводов, и сводка, по которой он собран
+        self._last_text = None
+        self._text_summary = None
         self._build()
 
     def _build(self):
@@ -906,8 +758,26 @@ class AnalyticsPage(ttk.Frame):
             bg="#FFFFFF",
         )
         self.canvas.grid(row=1, column=0, sticky="nsew", padx=(10, 4), pady=(0, 10))
+        # элементы графика создаются один раз, при перерисовке меняются только
+        # их координаты и текст; до первой отрисовки они скрыты
+        self._bar_ids = []
+        self._label_ids = []
+        self._value_ids = []
+        for name, _ in _BAR_SPEC:
+            self._bar_ids.append(self.canvas.create_rectangle(
+                0, 0, 0, 0, outline="", state="hidden", tags=("chart",)
+            ))
+            self._label_ids.append(self.canvas.create_text(
+                0, 0, text=name, fill="#111827", font=FONT_SMALL,
+                state="hidden", tags=("chart",),
+            ))
+            self._value_ids.append(self.canvas.create_text(
+                0, 0, fill="#111827", font=FONT_SMALL,
+                state="hidden", tags=("chart",),
+            ))
         # важно: перерисовывать при изменении размеров
-        self.canvas.bind("<Configure>", lambda e: self._draw_chart())
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
+        self.canvas.bind("<Map>", self._on_canvas_map)
 
         right = ttk.Frame(self)
         right.grid(row=1, column=1, sticky="nsew", padx=(4, 10), pady=(0, 10))
@@ -925,111 +795,242 @@ class AnalyticsPage(ttk.Frame):
             bg="#FFFFFF",
             fg="#111827",
             insertbackground="#111827",
-            font=("Segoe UI", 9),
+            font=FONT_SMALL,
         )
         self.text.grid(row=1, column=0, sticky="nsew")
         self.text.configure(state="disabled")
 
-        self.refresh()
-
     def refresh(self):
-        income, expense, by_cat = self.store.get_month_summary()
+        self._summary = None
+        summary = self._get_summary()
         self.subtitle_var.set("Текущий месяц, валюта: RUB")
-        self._update_text(income, expense, by_cat)
+        # DataStore отдает тот же кортеж, пока сводка не изменилась, - тогда
+        # текст (и поиск крупнейшей категории) пересчитывать незачем
+        if summary is not self._text_summary:
+            self._update_text(*summary)
+            self._text_summary = summary
         self._draw_chart()
 
+    def _get_summary(self):
+        if self._summary is None:
+            self._summary = self.store.get_month_summary()
+        return self._summary
+
     def _update_text(self, income: float, expense: float, by_cat: Dict[str, float]):
+        new = self._format_text(income, expense, by_cat)
+        if new == self._last_text:
+            return
         self.text.configure(state="normal")
-        self.text.delete("1.0", "end")
+        self.text.replace("1.0", "end", new)
+        self.text.configure(state="disabled")
+        self._last_text = new
 
+    def _format_text(self, income: float, expense: float, by_cat: Dict[str, float]) -> str:
         net = income + expense
 
         if income == 0 and expense == 0:
-            self.text.insert(
-                "end",
-                "За текущий месяц движения по счетам отсутствуют.",
-            )
-            self.text.configure(state="disabled")
-            return
+            return "За текущий месяц движения по счетам отсутствуют."
 
         main_cat = None
         if by_cat:
             main_cat = max(by_cat.items(), key=lambda x: abs(x[1]))
 
-        lines = []
-        lines.append(f"1. Доход за месяц: {income:,.2f} RUB.")
-        lines.append(f"2. Расход за месяц: {expense:,.2f} RUB.")
-        lines.append(f"3. Чистый результат: {net:,.2f} RUB.")
+        text = (
+            f"1. Доход за месяц: {income:,.2f} RUB.\n"
+            f"2. Расход за месяц: {expense:,.2f} RUB.\n"
+            f"3. Чистый результат: {net:,.2f} RUB."
+        )
         if main_cat:
-            lines.append(
-                f"4. Наибольшая по объему категория: {main_cat[0]} ({main_cat[1]:,.2f} RUB)."
+            text += (
+                f"\n4. Наибольшая по объему категория: {main_cat[0]} ({main_cat[1]:,.2f} RUB)."
             )
-
-        self.text.insert("end", "\n".join(lines))
-        self.text.configure(state="disabled")
+        return text
+
+    def _on_canvas_map(self, event):
+        if not self._canvas_mapped:
+            self._canvas_mapped = True
+            # первая отрисовка - после того, как Tk разложит окно
+            self.after_idle(self._draw_chart)
+
+    def _on_canvas_configure(self, event):
+        self._canvas_size = (event.width, event.height)
+        # при перетаскивании края окна события идут потоком - рисуем только последний размер
+        if self._redraw_job is not None:
+            self.after_cancel(self._redraw_job)
+        self._redraw_job = self.after(40, self._redraw_after_resize)
+
+    def _redraw_after_resize(self):
+        self._redraw_job = None
+        self._draw_chart()
 
     def _draw_chart(self):
-        self.canvas.delete("all")
+        if not self._canvas_mapped:
+            # холст еще не на экране - рисовать нечего, см. _on_canvas_map
+            return
+        income, expense, _ = self._get_summary()
+        if self._canvas_size is not None:
+            w, h = self._canvas_size
+        else:
+            # размер еще не приходил в <Configure> - спрашиваем у Tk
+            w = self.canvas.winfo_width() or 400
+            h = self.canvas.winfo_height() or 260
+        if w <= 1 or h <= 1:
+            # Tk еще не выдал холсту настоящий размер
+            return
+        key = (w, h, income, expense)
+        if key == self._chart_key:
+            # на холсте уже ровно этот график
+            return
+        self._chart_key = key
 
-        income, expense, _ = self.store.get_month_summary()
         # expense здесь отрицательный, но для высоты берем модуль
         expense_abs = abs(expense)
         net = income + expense
 
         if income == 0 and expense == 0:
             # нечего рисовать
+            self.canvas.itemconfigure("chart", state="hidden")
             return
 
-        w = self.canvas.winfo_width() or 400
-        h = self.canvas.winfo_height() or 260
+        # при одном лишь изменении размера подписи и цвета остаются прежними
+        values_changed = (income, expense) != self._chart_values
+        self._chart_values = (income, expense)
+
         padding = 40
         bottom = h - padding
-        top = padding
 
         max_val = max(income, expense_abs, abs(net), 1)
+        net_color = _INCOME_COLOR if net >= 0 else _EXPENSE_COLOR
+        heights = (income, expense_abs, abs(net))
+        labels = (income, expense, net)
 
-        values = [
-            ("Доход", income, "#22C55E"),
-            ("Расход", expense_abs, "#EF4444"),
-            ("Результат", abs(net), "#22C55E" if net >= 0 else "#EF4444"),
-        ]
-        labels = {
-            "Доход": income,
-            "Расход": expense,
-            "Результат": net,
-        }
-
-        bar_width = (w - 2 * padding) / (len(values) * 1.5)
+        bar_width = (w - 2 * padding) / (len(_BAR_SPEC) * 1.5)
         gap = bar_width / 2
+        scale = (h - 2 * padding) / max_val
 
-        for i, (name, val_abs, color) in enumerate(values):
+        coords = self.canvas.coords
+        itemconfigure = self.canvas.itemconfigure
+        for i, (_, color) in enumerate(_BAR_SPEC):
             x_center = padding + bar_width / 2 + i * (bar_width + gap)
             x0 = x_center - bar_width / 2
             x1 = x_center + bar_width / 2
 
-            bar_height = (val_abs / max_val) * (h - 2 * padding)
-            y0 = bottom - bar_height
+            y0 = bottom - heights[i] * scale
             y1 = bottom
 
-            self.canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline="")
+            bar_id = self._bar_ids[i]
+            coords(bar_id, x0, y0, x1, y1)
+            coords(self._label_ids[i], x_center, bottom + 15)
+            value_id = self._value_ids[i]
+            coords(value_id, x_center, y0 - 10)
+
+            if values_changed:
+                itemconfigure(bar_id, fill=color or net_color)
+                itemconfigure(value_id, text=f"{labels[i]:,.0f}")
+
+        self.canvas.itemconfigure("chart", state="normal")
 
-            self.canvas.create_text(
-                x_center,
-                bottom + 15,
-                text=name,
-                fill="#111827",
-                font=("Segoe UI", 9),
-            )
-            self.canvas.create_text(
-                x_center,
-                y0 - 10,
-                text=f"{labels[name]:,.0f}",
-                fill="#111827",
-                font=("Segoe UI", 9),
-            )
+
+# Основные цвета
+_COLOR_BG = "#0F172A"          # темно-синий фон вокруг
+_COLOR_CONTENT_BG = "#F3F4F6"  # фон контента
+_COLOR_CARD_BG = "#FFFFFF"
+_COLOR_TEXT = "#111827"
+_COLOR_TEXT_MUTED = "#6B7280"
+_COLOR_ACCENT = "#2563EB"
+_COLOR_ACCENT_HOVER = "#1D4ED8"
 
 
 class App(tk.Tk):
+    # Параметры ttk-стилей: имя стиля -> аргументы style.configure / style.map
+    _STYLE_SPEC = {
+        # Базовые настройки
+        ".": {"background": _COLOR_CONTENT_BG, "foreground": _COLOR_TEXT, "font": FONT_TEXT},
+        "TFrame": {"background": _COLOR_CONTENT_BG},
+        "TLabel": {"background": _COLOR_CONTENT_BG, "foreground": _COLOR_TEXT},
+        # Заголовки
+        "Header.TLabel": {"font": FONT_HEADER},
+        "Subheader.TLabel": {"font": FONT_SMALL, "foreground": _COLOR_TEXT_MUTED},
+        # Карточки
+        "Card.TFrame": {"background": _COLOR_CARD_BG, "relief": "flat", "borderwidth": 0},
+        "CardTitle.TLabel": {"background": _COLOR_CARD_BG, "foreground": _COLOR_TEXT_MUTED},
+        "CardTitleAccent.TLabel": {"background": _COLOR_CARD_BG, "foreground": _COLOR_ACCENT},
+        "CardValue.TLabel": {
+            "background": _COLOR_CARD_BG,
+            "foreground": _COLOR_TEXT,
+            "font": FONT_VALUE,
+        },
+        "CardValueAccent.TLabel": {
+            "background": _COLOR_CARD_BG,
+            "foreground": _COLOR_ACCENT,
+            "font": FONT_VALUE_LARGE,
+        },
+        # Кнопки
+        "TButton": {
+            "padding": (12, 6),
+            "background": "#E5E7EB",
+            "foreground": _COLOR_TEXT,
+            "borderwidth": 0,
+            "focusthickness": 0,
+        },
+        "Accent.TButton": {
+            "background": _COLOR_ACCENT,
+            "foreground": "#FFFFFF",
+            "padding": (14, 6),
+        },
+        # Notebook (вкладки)
+        "TNotebook": {
+            "background": _COLOR_BG,
+            "borderwidth": 0,
+            "tabmargins": (8, 4, 8, 0),
+        },
+        "TNotebook.Tab": {
+            "background": "#E5E7EB",
+            "foreground": _COLOR_TEXT_MUTED,
+            "padding": (18, 8),
+            "font": FONT_TEXT,
+        },
+        # Таблицы
+        "Data.Treeview": {
+            "background": "#FFFFFF",
+            "fieldbackground": "#FFFFFF",
+            "foreground": _COLOR_TEXT,
+            "rowheight": 24,
+            "borderwidth": 0,
+        },
+        "Treeview.Heading": {
+            "background": "#E5E7EB",
+            "foreground": _COLOR_TEXT_MUTED,
+            "font": FONT_SMALL_BOLD,
+            "relief": "flat",
+        },
+        # Поля ввода / комбобоксы
+        "TEntry": {
+            "foreground": _COLOR_TEXT,
+            "fieldbackground": "#FFFFFF",
+            "insertcolor": _COLOR_TEXT,
+        },
+        "TCombobox": {
+            "foreground": _COLOR_TEXT,
+            "fieldbackground": "#FFFFFF",
+            "background": "#E5E7EB",
+        },
+    }
+    _STYLE_MAP_SPEC = {
+        "TButton": {"background": [("active", "#D1D5DB"), ("pressed", "#D1D5DB")]},
+        "Accent.TButton": {
+            "background": [("active", _COLOR_ACCENT_HOVER), ("pressed", _COLOR_ACCENT_HOVER)],
+        },
+        "TNotebook.Tab": {
+            "background": [("selected", _COLOR_CARD_BG)],
+            "foreground": [("selected", _COLOR_TEXT)],
+        },
+        "Data.Treeview": {
+            "background": [("selected", "#DBEAFE")],
+            "foreground": [("selected", "#111827")],
+        },
+    }
+
     def __init__(self):
         super().__init__()
         self.title("Финансовая информационная система (RUB)")
@@ -1037,147 +1038,39 @@ class App(tk.Tk):
         self.minsize(900, 550)
 
         self.store = DataStore()
+        self.store.attach_tk(self)
+        # тема, для которой уже настроены стили
+        self._style_theme = None
+        self._create_fonts()
         self._configure_style()
         self._build()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _create_fonts(self):
+        # ссылки нужно держать: при удалении объекта Font Tk удаляет и сам шрифт
+        self._fonts = [
+            tkfont.Font(self, name=name, **options) for name, options in _FONT_SPECS.items()
+        ]
+
+    def _configure_style(self, theme: str = "clam"):
+        # повторный вызов с той же темой ничего не делает
+        if self._style_theme == theme:
+            return
+        self._style_theme = theme
 
-    def _configure_style(self):
         style = ttk.Style(self)
         try:
-            style.theme_use("clam")
+            style.theme_use(theme)
         except tk.TclError:
             pass
 
-        # Основные цвета
-        bg = "#0F172A"          # темно-синий фон вокруг
-        content_bg = "#F3F4F6"  # фон контента
-        card_bg = "#FFFFFF"
-        text = "#111827"
-        text_muted = "#6B7280"
-        accent = "#2563EB"
-        accent_hover = "#1D4ED8"
-
         # фон окна
-        self.configure(bg=bg)
-
-        # Базовые настройки
-        style.configure(
-            ".",
-            background=content_bg,
-            foreground=text,
-            font=("Segoe UI", 10)
-        )
-        style.configure("TFrame", background=content_bg)
-        style.configure("TLabel", background=content_bg, foreground=text)
-
-        # Заголовки
-        style.configure("Header.TLabel", font=("Segoe UI Semibold", 18))
-        style.configure("Subheader.TLabel", font=("Segoe UI", 9), foreground=text_muted)
-
-        # Карточки
-        style.configure(
-            "Card.TFrame",
-            background=card_bg,
-            relief="flat",
-            borderwidth=0
-        )
-        style.configure("CardTitle.TLabel", background=card_bg, foreground=text_muted)
-        style.configure(
-            "CardTitleAccent.TLabel",
-            background=card_bg,
-            foreground=accent,
-        )
-        style.configure(
-            "CardValue.TLabel",
-            background=card_bg,
-            foreground=text,
-            font=("Segoe UI Semibold", 16),
-        )
-        style.configure(
-            "CardValueAccent.TLabel",
-            background=card_bg,
-            foreground=accent,
-            font=("Segoe UI Semibold", 20),
-        )
-
-        # Кнопки
-        style.configure(
-            "TButton",
-            padding=(12, 6),
-            background="#E5E7EB",
-            foreground=text,
-            borderwidth=0,
-            focusthickness=0
-        )
-        style.map(
-            "TButton",
-            background=[("active", "#D1D5DB"), ("pressed", "#D1D5DB")],
-        )
-        style.configure(
-            "Accent.TButton",
-            background=accent,
-            foreground="#FFFFFF",
-            padding=(14, 6)
-        )
-        style.map(
-            "Accent.TButton",
-            background=[("active", accent_hover), ("pressed", accent_hover)],
-        )
-
-        # Notebook (вкладки)
-        style.configure(
-            "TNotebook",
-            background=bg,
-            borderwidth=0,
-            tabmargins=(8, 4, 8, 0),
-        )
-        style.configure(
-            "TNotebook.Tab",
-            background="#E5E7EB",
-            foreground=text_muted,
-            padding=(18, 8),
-            font=("Segoe UI", 10),
-        )
-        style.map(
-            "TNotebook.Tab",
-            background=[("selected", card_bg)],
-            foreground=[("selected", text)],
-        )
+        self.configure(bg=_COLOR_BG)
 
-        # Таблицы
-        style.configure(
-            "Data.Treeview",
-            background="#FFFFFF",
-            fieldbackground="#FFFFFF",
-            foreground=text,
-            rowheight=24,
-            borderwidth=0,
-        )
-        style.map(
-            "Data.Treeview",
-            background=[("selected", "#DBEAFE")],
-            foreground=[("selected", "#111827")],
-        )
-        style.configure(
-            "Treeview.Heading",
-            background="#E5E7EB",
-            foreground=text_muted,
-            font=("Segoe UI", 9, "bold"),
-            relief="flat",
-        )
-
-        # Поля ввода / комбобоксы
-        style.configure(
-            "TEntry",
-            foreground=text,
-            fieldbackground="#FFFFFF",
-            insertcolor=text,
-        )
-        style.configure(
-            "TCombobox",
-            foreground=text,
-            fieldbackground="#FFFFFF",
-            background="#E5E7EB",
-        )
+        for name, options in self._STYLE_SPEC.items():
+            style.configure(name, **options)
+        for name, options in self._STYLE_MAP_SPEC.items():
+            style.map(name, **options)
 
     def _build(self):
         # Внешний фрейм на темном фоне
@@ -1196,7 +1089,7 @@ class App(tk.Tk):
             text="📊 Финансовая информационная система",
             bg="#0F172A",
             fg="#E5E7EB",
-            font=("Segoe UI Semibold", 20)
+            font=FONT_VALUE_LARGE
         )
         title_lbl.grid(row=0, column=0, sticky="w")
 
@@ -1205,7 +1098,7 @@ class App(tk.Tk):
             text="управление счетами и операциями (RUB)",
             bg="#0F172A",
             fg="#9CA3AF",
-            font=("Segoe UI", 9)
+            font=FONT_SMALL
         )
         subtitle_lbl.grid(row=1, column=0, sticky="w", pady=(0, 8))
 
@@ -1223,24 +1116,28 @@ class App(tk.Tk):
 
         notebook = ttk.Notebook(inner)
         notebook.grid(row=0, column=0, sticky="nsew")
+        self.notebook = notebook
 
         self.page_overview = OverviewPage(notebook, self.store)
-        self.page_accounts = AccountsPage(notebook, self.store, on_changed=self._on_data_changed)
-        self.page_transactions = TransactionsPage(
-            notebook, self.store, on_changed=self._on_data_changed
-        )
+        self.page_accounts = AccountsPage(notebook, self.store)
+        self.page_transactions = TransactionsPage(notebook, self.store)
         self.page_analytics = AnalyticsPage(notebook, self.store)
 
         notebook.add(self.page_overview, text="Обзор")
         notebook.add(self.page_accounts, text="Счета")
         notebook.add(self.page_transactions, text="Операции")
         notebook.add(self.page_analytics, text="Аналитика")
+        notebook.bind("<<NotebookTabChanged>>", lambda e: self._refresh_current())
+
+        # при запуске заполняется только открытая вкладка, остальные - при переходе на них
+        self._refresh_current()
+
+    def _on_close(self):
+        self.store.flush()
+        self.destroy()
 
-    def _on_data_changed(self):
-        self.page_overview.refresh()
-        self.page_accounts.refresh()
-        self.page_transactions.refresh()
-        self.page_analytics.refresh()
+    def _refresh_current(self):
+        self.nametowidget(self.notebook.select()).refresh_if_stale()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,663 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, List, Dict, Optional, Tuple
+import bisect
+import csv
+import json
+import math
+import os
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# категории и валюта интернируются: одинаковые строки из файла данных
+# становятся одним объектом, а их сравнение и хеширование - дешевле
+EXPENSE_CATEGORIES = [sys.intern(c) for c in (
+    "Транспорт",
+    "Аренда",
+    "Коммунальные услуги",
+    "Связь и интернет",
+    "Прочие операционные расходы",
+)]
+
+INCOME_CATEGORIES = [sys.intern(c) for c in (
+    "Оказание услуг",
+    "Продажа товаров",
+    "Проценты и прочие доходы",
+    "Прочие доходы",
+)]
+
+BASE_CURRENCY = sys.intern("RUB")
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+# slots у dataclass появились в Python 3.10; на более старых версиях - обычные классы
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def _json_dumps(data, non_finite: bool = False) -> bytes:
+    # orjson записывает NaN и бесконечность как null, а json - как NaN/Infinity
+    if orjson is not None and not non_finite:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _json_loads(buf: bytes):
+    if orjson is not None:
+        try:
+            return orjson.loads(buf)
+        except orjson.JSONDecodeError:
+            # например, NaN/Infinity в файлах, записанных через json
+            pass
+    return json.loads(buf.decode("utf-8"))
+
+
+def _check_finite(value: float) -> float:
+    """Суммы и балансы должны быть конечными числами."""
+    if not math.isfinite(value):
+        raise ValueError(f"Недопустимая сумма: {value}")
+    return value
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class Account:
+    id: int
+    name: str
+    acc_type: str
+    currency: str = BASE_CURRENCY
+    initial_balance: float = 0.0
+    # отформатированный начальный баланс для таблицы счетов (см. initial_str)
+    _initial_str: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def initial_str(self) -> str:
+        if self._initial_str is None:
+            self._initial_str = f"{self.initial_balance:,.2f}"
+        return self._initial_str
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "acc_type": self.acc_type,
+            "currency": self.currency,
+            "initial_balance": self.initial_balance,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Account":
+        get = data.get
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            acc_type=get("acc_type", "Счет"),
+            currency=sys.intern(get("currency", BASE_CURRENCY)),
+            initial_balance=float(get("initial_balance", 0.0)),
+        )
+
+@dataclass(**_DATACLASS_OPTIONS)
+class Transaction:
+    id: int
+    date: datetime
+    account_id: int
+    category: str
+    description: str
+    amount: float
+    currency: str = BASE_CURRENCY
+    # дата и сумма в готовом виде, форматируются при первом обращении
+    _date_str: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _amount_str: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def date_str(self) -> str:
+        if self._date_str is None:
+            self._date_str = self.date.strftime(DATE_FORMAT)
+        return self._date_str
+
+    @property
+    def amount_str(self) -> str:
+        if self._amount_str is None:
+            self._amount_str = f"{self.amount:,.2f}"
+        return self._amount_str
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "date": self.date.isoformat(),
+            "account_id": self.account_id,
+            "category": self.category,
+            "description": self.description,
+            "amount": self.amount,
+            "currency": self.currency,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Transaction":
+        try:
+            # в файлах, сохраненных приложением, есть все поля - обходимся без get()
+            return cls(
+                id=data["id"],
+                date=datetime.fromisoformat(data["date"]),
+                account_id=int(data["account_id"]),
+                category=sys.intern(data["category"]),
+                description=data["description"],
+                amount=float(data["amount"]),
+                currency=sys.intern(data["currency"]),
+            )
+        except KeyError:
+            pass
+        get = data.get
+        return cls(
+            id=data["id"],
+            date=datetime.fromisoformat(data["date"]),
+            account_id=int(get("account_id", 1)),
+            category=sys.intern(get("category", "Прочие операционные расходы")),
+            description=get("description", ""),
+            amount=float(get("amount", 0.0)),
+            currency=sys.intern(get("currency", BASE_CURRENCY)),
+        )
+
+
+def _tx_sort_key(tx: Transaction) -> Tuple[timedelta, int]:
+    """Ключ сортировки операций: по убыванию даты, при равенстве дат - по id."""
+    return datetime.max - tx.date, tx.id
+
+
+def _month_code(year: int, month: int) -> int:
+    """Номер месяца от начала летоисчисления: один int вместо пары (год, месяц)."""
+    return year * 12 + month - 1
+
+
+class _TxColumns:
+    """
+    Поля операций, разложенные по массивам NumPy (по одному на поле),
+    для векторного подсчета месячных сводок. Порядок строк произвольный:
+    при удалении на место строки переносится последняя. Категории хранятся
+    числовыми кодами, названия - в cat_names; год и месяц - одним кодом
+    (см. _month_code).
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.size = 0
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.amounts = np.empty(capacity, dtype=np.float64)
+        self.month_codes = np.empty(capacity, dtype=np.int32)
+        self.cat_codes = np.empty(capacity, dtype=np.int32)
+        self.cat_names: List[str] = []
+        self._cat_code_by_name: Dict[str, int] = {}
+        self._row_by_id: Dict[int, int] = {}
+
+    @classmethod
+    def from_transactions(cls, transactions: List[Transaction]) -> "_TxColumns":
+        """Заполняет колонки сразу целиком - при загрузке, без append на каждую строку."""
+        n = len(transactions)
+        columns = cls(max(64, n))
+        code_by_name = columns._cat_code_by_name
+        names = columns.cat_names
+        cat_codes = []
+        for t in transactions:
+            code = code_by_name.get(t.category)
+            if code is None:
+                code = code_by_name[t.category] = len(names)
+                names.append(t.category)
+            cat_codes.append(code)
+        columns.ids[:n] = np.fromiter((t.id for t in transactions), dtype=np.int64, count=n)
+        columns.amounts[:n] = np.fromiter(
+            (t.amount for t in transactions), dtype=np.float64, count=n
+        )
+        columns.month_codes[:n] = np.fromiter(
+            (_month_code(t.date.year, t.date.month) for t in transactions),
+            dtype=np.int32,
+            count=n,
+        )
+        columns.cat_codes[:n] = np.array(cat_codes, dtype=np.int32)
+        columns._row_by_id = {t.id: row for row, t in enumerate(transactions)}
+        columns.size = n
+        return columns
+
+    def _grow(self) -> None:
+        capacity = len(self.ids) * 2
+        for name in ("ids", "amounts", "month_codes", "cat_codes"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            setattr(self, name, new)
+
+    def append(self, tx: Transaction) -> None:
+        if self.size == len(self.ids):
+            self._grow()
+        row = self.size
+        self.size += 1
+        self._row_by_id[tx.id] = row
+        self.ids[row] = tx.id
+        self.month_codes[row] = _month_code(tx.date.year, tx.date.month)
+        self._set_values(row, tx)
+
+    def update(self, tx: Transaction) -> None:
+        self._set_values(self._row_by_id[tx.id], tx)
+
+    def _set_values(self, row: int, tx: Transaction) -> None:
+        self.amounts[row] = tx.amount
+        code = self._cat_code_by_name.get(tx.category)
+        if code is None:
+            code = len(self.cat_names)
+            self.cat_names.append(tx.category)
+            self._cat_code_by_name[tx.category] = code
+        self.cat_codes[row] = code
+
+    def remove(self, tx_id: int) -> None:
+        row = self._row_by_id.pop(tx_id)
+        last = self.size - 1
+        if row != last:
+            for arr in (self.ids, self.amounts, self.month_codes, self.cat_codes):
+                arr[row] = arr[last]
+            self._row_by_id[int(self.ids[row])] = row
+        self.size = last
+
+    def month_summary(self, year: int, month: int):
+        n = self.size
+        names = self.cat_names
+        code = _month_code(year, month)
+        rows = np.flatnonzero(self.month_codes[:n] == code)
+        month_amounts = self.amounts[rows]
+        month_cats = self.cat_codes[rows]
+        income = float(month_amounts[month_amounts >= 0].sum())
+        expense = float(month_amounts[month_amounts < 0].sum())
+        totals = np.bincount(month_cats, weights=month_amounts, minlength=len(names))
+        counts = np.bincount(month_cats, minlength=len(names))
+        by_category = {names[c]: float(totals[c]) for c in np.flatnonzero(counts)}
+        return income, expense, by_category
+
+
+class DataStore:
+    def __init__(self, path: str = "fintech_data_full.json"):
+        self.path = path
+        self.accounts: List[Account] = []
+        # операции в порядке добавления; словарь и есть основное хранилище
+        self._tx_by_id: Dict[int, Transaction] = {}
+        self.settings: Dict[str, str] = {
+            "user_name": "Компания",
+        }
+        self._next_acc_id = 1
+        self._next_tx_id = 1
+
+        # отложенное сохранение: save() только помечает данные измененными,
+        # а запись на диск выполняет flush() по таймеру Tk
+        self._tk = None
+        self._dirty = False
+        self._save_after = None
+        self._save_delay = 500
+
+        # подписчики на изменения: (тема, обработчик), темы - "accounts", "transactions"
+        self._listeners: List[Tuple[str, Callable[[], None]]] = []
+
+        # текущие балансы счетов, обновляются инкрементально при изменениях
+        self._balances: Dict[int, float] = {}
+        # индекс счетов по id для быстрого поиска
+        self._acc_by_id: Dict[int, Account] = {}
+        # растет при каждом изменении счетов, чтобы страницы знали, когда обновить кэш
+        self._acc_version = 0
+        # операции по убыванию даты и параллельный список ключей для bisect
+        self._tx_sorted: List[Transaction] = []
+        self._tx_sort_keys: List[Tuple[timedelta, int]] = []
+        # (год, месяц) -> (доход, расход, суммы по категориям)
+        self._month_cache: Dict[Tuple[int, int], Tuple[float, float, Dict[str, float]]] = {}
+        # колонки NumPy для агрегатов; None, если numpy не установлен
+        self._columns: Optional[_TxColumns] = None
+        # в загруженном файле есть NaN/Infinity - сохранять его нужно через json
+        self._non_finite = False
+
+        loaded = self.load()
+        self._rebuild_indexes()
+        self._rebuild_balances()
+        # нечитаемый файл не затирается счетом по умолчанию
+        if loaded and not self.accounts:
+            self.add_account("Расчетный счет", "Карта", BASE_CURRENCY, 0.0)
+            self.save()
+
+
+    def attach_tk(self, root, delay_ms: int = 500) -> None:
+        """
+        Включает отложенное сохранение через таймер указанного окна Tk.
+        tkinter здесь не импортируется: от root нужны только after/after_cancel.
+        """
+        self._tk = root
+        self._save_delay = delay_ms
+
+    def subscribe(self, topic: str, callback: Callable[[], None]) -> None:
+        self._listeners.append((topic, callback))
+
+    def notify(self, topic: str) -> None:
+        for listener_topic, callback in self._listeners:
+            if listener_topic == topic:
+                callback()
+
+    def get_user_name(self) -> str:
+        return self.settings.get("user_name", "Компания")
+
+
+    def add_account(
+        self,
+        name: str,
+        acc_type: str,
+        currency: str,
+        initial_balance: float,
+    ) -> Account:
+        acc = Account(
+            id=self._next_acc_id,
+            name=name,
+            acc_type=acc_type,
+            currency=currency,
+            initial_balance=_check_finite(initial_balance),
+        )
+        self.accounts.append(acc)
+        self._acc_by_id[acc.id] = acc
+        self._acc_version += 1
+        self._balances[acc.id] = initial_balance
+        # в файлах старого формата уже могут быть операции с этим id счета
+        for t in self._tx_by_id.values():
+            if t.account_id == acc.id:
+                self._apply_to_balance(t, 1)
+        self._next_acc_id += 1
+        self.save()
+        return acc
+
+    def update_account(
+        self,
+        acc_id: int,
+        name: str,
+        acc_type: str,
+        initial_balance: float,
+    ) -> None:
+        acc = self.get_account_by_id(acc_id)
+        if not acc:
+            return
+        _check_finite(initial_balance)
+        acc.name = name
+        acc.acc_type = acc_type
+        self._balances[acc.id] = (
+            self._balances.get(acc.id, 0.0) - acc.initial_balance + initial_balance
+        )
+        acc.initial_balance = initial_balance
+        acc._initial_str = None
+        self._acc_version += 1
+        self.save()
+
+    def get_accounts(self) -> List[Account]:
+        return list(self.accounts)
+
+    def get_accounts_map(self) -> Dict[int, Account]:
+        """Словарь id -> счет. Внутренний индекс - только для чтения."""
+        return self._acc_by_id
+
+    def get_accounts_version(self) -> int:
+        return self._acc_version
+
+    def get_account_by_id(self, acc_id: int) -> Optional[Account]:
+        return self._acc_by_id.get(acc_id)
+
+    def get_account_balance(self, acc_id: int) -> float:
+        return self._balances.get(acc_id, 0.0)
+
+    def get_overall_balance(self) -> float:
+        return sum(self._balances.values())
+
+    def _rebuild_indexes(self) -> None:
+        self._acc_by_id = {a.id: a for a in self.accounts}
+        # ключ каждой операции считается один раз; сортируются номера, а не пары
+        # (ключ, операция) - сравнение вложенных кортежей заметно медленнее
+        transactions = list(self._tx_by_id.values())
+        keys = [_tx_sort_key(t) for t in transactions]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._tx_sort_keys = [keys[i] for i in order]
+        self._tx_sorted = [transactions[i] for i in order]
+        if np is not None:
+            self._columns = _TxColumns.from_transactions(transactions)
+
+    def _rebuild_balances(self) -> None:
+        self._balances = {a.id: a.initial_balance for a in self.accounts}
+        for t in self._tx_by_id.values():
+            self._apply_to_balance(t, 1)
+
+    def _apply_to_balance(self, tx: "Transaction", sign: int) -> None:
+        """Учитывает (sign=1) или отменяет (sign=-1) операцию в балансе ее счета."""
+        acc = self.get_account_by_id(tx.account_id)
+        if acc and tx.currency == acc.currency:
+            self._balances[acc.id] += sign * tx.amount
+
+
+    def add_transaction(
+        self,
+        account_id: int,
+        amount: float,
+        category: str,
+        description: str,
+        date: Optional[datetime] = None,
+    ) -> Transaction:
+        if date is None:
+            date = datetime.now()
+        tx = Transaction(
+            id=self._next_tx_id,
+            date=date,
+            account_id=account_id,
+            category=category,
+            description=description,
+            amount=_check_finite(amount),
+            currency=BASE_CURRENCY,
+        )
+        self._tx_by_id[tx.id] = tx
+        key = _tx_sort_key(tx)
+        pos = bisect.bisect_right(self._tx_sort_keys, key)
+        self._tx_sort_keys.insert(pos, key)
+        self._tx_sorted.insert(pos, tx)
+        self._apply_to_balance(tx, 1)
+        if self._columns is not None:
+            self._columns.append(tx)
+        self._add_to_month_cache(tx)
+        self._next_tx_id += 1
+        self.save()
+        return tx
+
+    def update_transaction(
+        self,
+        tx_id: int,
+        account_id: int,
+        amount: float,
+        category: str,
+        description: str,
+    ) -> None:
+        tx = self.get_transaction_by_id(tx_id)
+        if not tx:
+            return
+        _check_finite(amount)
+        self._apply_to_balance(tx, -1)
+        self._month_cache.pop((tx.date.year, tx.date.month), None)
+        tx.account_id = account_id
+        tx.amount = amount
+        tx._amount_str = None
+        tx.category = category
+        tx.description = description
+        self._apply_to_balance(tx, 1)
+        if self._columns is not None:
+            self._columns.update(tx)
+        self.save()
+
+    def delete_transaction(self, tx_id: int) -> None:
+        tx = self._tx_by_id.pop(tx_id, None)
+        if tx:
+            pos = bisect.bisect_left(self._tx_sort_keys, _tx_sort_key(tx))
+            del self._tx_sort_keys[pos]
+            del self._tx_sorted[pos]
+            self._apply_to_balance(tx, -1)
+            self._month_cache.pop((tx.date.year, tx.date.month), None)
+            if self._columns is not None:
+                self._columns.remove(tx_id)
+            self.save()
+
+    @property
+    def transactions(self) -> List[Transaction]:
+        """Операции в порядке добавления."""
+        return list(self._tx_by_id.values())
+
+    def get_transactions(self) -> List[Transaction]:
+        """Операции по убыванию даты. Список внутренний - только для чтения."""
+        return self._tx_sorted
+
+    def get_transaction_by_id(self, tx_id: int) -> Optional[Transaction]:
+        return self._tx_by_id.get(tx_id)
+
+    def get_month_summary(self):
+        """Возвращает доход (>0), расход (<0) и суммы по категориям за текущий месяц."""
+        now = datetime.now()
+        key = (now.year, now.month)
+        summary = self._month_cache.get(key)
+        if summary is None:
+            summary = self._compute_month_summary(now.year, now.month)
+            self._month_cache[key] = summary
+        return summary
+
+    def _compute_month_summary(self, year: int, month: int):
+        if self._columns is not None:
+            return self._columns.month_summary(year, month)
+
+        income = 0.0
+        expense = 0.0
+        by_category: Dict[str, float] = {}
+
+        for t in self._tx_by_id.values():
+            if t.date.year == year and t.date.month == month:
+                if t.amount >= 0:
+                    income += t.amount
+                else:
+                    expense += t.amount
+                by_category[t.category] = by_category.get(t.category, 0.0) + t.amount
+
+        return income, expense, by_category
+
+    def _add_to_month_cache(self, tx: Transaction) -> None:
+        key = (tx.date.year, tx.date.month)
+        cached = self._month_cache.get(key)
+        if cached is None:
+            return
+        income, expense, by_category = cached
+        # словарь копируется: ранее возвращенные сводки не должны меняться
+        by_category = dict(by_category)
+        by_category[tx.category] = by_category.get(tx.category, 0.0) + tx.amount
+        if tx.amount >= 0:
+            income += tx.amount
+        else:
+            expense += tx.amount
+        self._month_cache[key] = (income, expense, by_category)
+
+    # ---- экспорт ----
+
+    def export_csv(self, filename: str = "Отчет.csv") -> None:
+        """
+        Экспорт в CSV с разделителем ; и заголовками на русском.
+        Кодировка utf-8-sig, чтобы Excel корректно отображал текст.
+        """
+        acc_by_id = self._acc_by_id
+        with open(filename, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f, delimiter=";", lineterminator="\n")
+            writer.writerow(["ID", "Дата", "Счет", "Категория", "Описание", "Сумма", "Валюта"])
+            for t in self.get_transactions():
+                acc = acc_by_id.get(t.account_id)
+                writer.writerow([
+                    t.id,
+                    t.date_str,
+                    acc.name if acc else "?",
+                    t.category,
+                    t.description,
+                    t.amount,
+                    BASE_CURRENCY,
+                ])
+
+    # ---- load / save ----
+
+    def load(self) -> bool:
+        """
+        Читает данные из файла. Возвращает False, если файл есть, но прочитать
+        его не удалось; тогда состояние хранилища не меняется.
+        """
+        if not os.path.exists(self.path):
+            return True
+        try:
+            with open(self.path, "rb") as f:
+                raw = _json_loads(f.read())
+            accounts = [
+                Account.from_dict(item) for item in raw.get("accounts", [])
+            ]
+            transactions = [
+                Transaction.from_dict(item) for item in raw.get("transactions", [])
+            ]
+            tx_by_id = {t.id: t for t in transactions}
+            # счетчики id сохраняются в файле; max() - для файлов старого формата
+            next_acc_id = self._next_acc_id
+            if "next_acc_id" in raw:
+                next_acc_id = int(raw["next_acc_id"])
+            elif accounts:
+                next_acc_id = max(a.id for a in accounts) + 1
+            next_tx_id = self._next_tx_id
+            if "next_tx_id" in raw:
+                next_tx_id = int(raw["next_tx_id"])
+            elif tx_by_id:
+                next_tx_id = max(tx_by_id) + 1
+            settings = raw.get("settings", {})
+        except Exception as e:
+            print("Ошибка загрузки данных:", e)
+            return False
+
+        self.accounts = accounts
+        self._tx_by_id = tx_by_id
+        self._next_acc_id = next_acc_id
+        self._next_tx_id = next_tx_id
+        self.settings.update(settings)
+        # такие значения бывают только в файлах, записанных до проверки сумм
+        amounts = [t.amount for t in transactions]
+        amounts.extend(a.initial_balance for a in accounts)
+        self._non_finite = not all(map(math.isfinite, amounts))
+        return True
+
+    def save(self) -> None:
+        self._dirty = True
+        if self._tk is None:
+            self.flush()
+        elif self._save_after is None:
+            self._save_after = self._tk.after(self._save_delay, self.flush)
+
+    def flush(self) -> None:
+        if self._save_after is not None:
+            self._tk.after_cancel(self._save_after)
+            self._save_after = None
+        if self._dirty:
+            self._dirty = False
+            self._save_now()
+
+    def _save_now(self) -> None:
+        try:
+            data = {
+                "accounts": [a.to_dict() for a in self.accounts],
+                "transactions": [t.to_dict() for t in self._tx_by_id.values()],
+                "settings": self.settings,
+                "next_acc_id": self._next_acc_id,
+                "next_tx_id": self._next_tx_id,
+            }
+            buf = _json_dumps(data, self._non_finite)
+            # пишем во временный файл и атомарно подменяем им основной,
+            # чтобы сбой посреди записи не оставил обрезанный JSON
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(buf)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print("Ошибка сохранения данных:", e)